@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
+import logging
 import os
+import re
+import smtplib
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -10,10 +15,32 @@ from config import Config
 from models import User, TextSource, DeliveryMethod
 from text_manager import TextManager
 from user_manager import UserManager
-from messaging import MessagingService
+from messaging import MessagingService, SUBJECT_PREFIX
 from translation_assembler import TranslationAssembler
 
 
+log = logging.getLogger(__name__)
+
+# SMTP errors caused by a single message or recipient; the backend itself is fine
+SOFT_SEND_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+# Errors that mean the delivery backend itself is unreachable: disconnects,
+# refused or reset connections, DNS failures and timeouts are all OSErrors
+HARD_SEND_ERRORS = (OSError,)
+
+# Abort a batch of at least ABORT_MIN_BATCH users once ABORT_MIN_FAILURES hard
+# failures make up a third or more of the attempts so far
+ABORT_MIN_BATCH = 30
+ABORT_MIN_FAILURES = 10
+
+# Characters dropped when turning a name into an ID
+_ID_STRIP_RE = re.compile(r'\W')
+
+# Generated IDs share one startup timestamp and a per-process sequence number
+_ID_EPOCH = int(time.time())
+_ID_SEQ = itertools.count()
+
+
 class TranslationServiceApp:
     """Main application for the text translation service."""
     
@@ -32,7 +59,9 @@ class TranslationServiceApp:
             'port': Config.EMAIL_PORT,
             'username': Config.EMAIL_HOST_USER,
             'password': Config.EMAIL_HOST_PASSWORD,
-            'use_tls': Config.EMAIL_USE_TLS
+            'use_tls': Config.EMAIL_USE_TLS,
+            'timeout': Config.EMAIL_TIMEOUT,
+            'enabled': Config.EMAIL_ENABLED
         }
         
         sms_config = {
@@ -118,14 +147,15 @@ class TranslationServiceApp:
         """
         # Get the text to find out how many sentences it has
         text = self.text_manager.get_text(text_id)
-        total_sentences = len(text.sentences)
+        total_sentences = text.n_sentences
         
         # Assign the text to the user
         self.user_manager.assign_text(user_id, text_id, total_sentences)
         
-        print(f"Assigned text '{text.title}' to user '{self.user_manager.get_user(user_id).name}'")
-        print(f"The text has {total_sentences} sentences, which will take approximately " +
-              f"{text.total_days()} days to translate at {text.sentences_per_day} sentences per day.")
+        log.info("Assigned text '%s' to user '%s'", text.title, self.user_manager.get_user(user_id).name)
+        log.info("The text has %d sentences, which will take approximately "
+                 "%d days to translate at %d sentences per day.",
+                 total_sentences, text.total_days(), text.sentences_per_day)
     
     def send_daily_portions(self, user_ids: Optional[List[str]] = None) -> None:
         """
@@ -137,11 +167,14 @@ class TranslationServiceApp:
         now = datetime.now()
         users_to_process = user_ids or list(self.user_manager.users.keys())
         
+        # Collect today's portions up front; only the sending itself runs on worker threads
+        tasks = []
         for user_id in users_to_process:
             user = self.user_manager.get_user(user_id)
+            progresses = self.user_manager.progress[user_id].values()
             
             # Get all progress objects for this user
-            for progress in self.user_manager.progress[user_id]:
+            for progress in progresses:
                 text_id = progress.text_id
                 
                 try:
@@ -149,37 +182,86 @@ class TranslationServiceApp:
                     text = self.text_manager.get_text(text_id)
                     
                     # Skip if we've sent all sentences
-                    if progress.current_position >= len(text.sentences):
-                        print(f"User {user.name} has completed all sentences for {text.title}")
+                    if progress.current_position >= text.n_sentences:
+                        log.info("User %s has completed all sentences for %s", user.name, text.title)
                         continue
                     
                     # Get sentences for today
                     start_position = progress.current_position
                     sentences = self.text_manager.get_daily_portion(text_id, start_position)
-                    sentence_indices = list(range(start_position, start_position + len(sentences)))
+                    tasks.append((user, text, start_position, sentences))
                     
-                    # Send the sentences
-                    result = self.messaging.send_daily_portion(
+                except Exception as e:
+                    log.warning("Error preparing today's portion for user %s from text %s: %s", user_id, text_id, e)
+        
+        sent = 0
+        failed = 0
+        
+        def record(future, task) -> None:
+            """Record the outcome of one finished send, updating progress if it went out."""
+            nonlocal sent, failed
+            user, text, start_position, sentences = task
+            
+            try:
+                if future.result():
+                    # Update progress
+                    self.user_manager.update_progress(
+                        user_id=user.id,
+                        text_id=text.id,
+                        position=start_position + len(sentences),
+                        sent_date=now
+                    )
+                    sent += 1
+                    log.info("Sent %d sentences from '%s' to %s", len(sentences), text.title, user.name)
+                else:
+                    log.warning("Failed to send sentences to %s", user.name)
+            
+            except SOFT_SEND_ERRORS as e:
+                log.warning("Error sending to user %s for text %s: %s", user.id, text.id, e)
+            except HARD_SEND_ERRORS as e:
+                failed += 1
+                log.warning("Error sending to user %s for text %s: %s", user.id, text.id, e)
+            except Exception as e:
+                log.warning("Error sending to user %s for text %s: %s", user.id, text.id, e)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=Config.SEND_MAX_WORKERS) as executor:
+                futures = {
+                    executor.submit(
+                        self.messaging.send_daily_portion,
                         user=user,
                         text_title=text.title,
                         sentences=sentences,
-                        sentence_indices=sentence_indices
-                    )
+                        start_index=start_position,
+                        now=now
+                    ): (user, text, start_position, sentences)
+                    for user, text, start_position, sentences in tasks
+                }
+                recorded = set()
+                
+                # Progress is only updated here, on the calling thread
+                for future in as_completed(futures):
+                    record(future, futures[future])
+                    recorded.add(future)
                     
-                    if result:
-                        # Update progress
-                        self.user_manager.update_progress(
-                            user_id=user_id,
-                            text_id=text_id,
-                            position=start_position + len(sentences),
-                            sent_date=now
+                    # Stop early if the backend looks dead rather than timing out on every user
+                    if (len(users_to_process) >= ABORT_MIN_BATCH
+                            and failed >= ABORT_MIN_FAILURES
+                            and failed * 3 >= sent + failed):
+                        # Pending sends are cancelled but those already running still finish;
+                        # record every one that went out so those users don't get the same portion again
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        for finished, task in futures.items():
+                            if finished not in recorded and finished.done() and not finished.cancelled():
+                                record(finished, task)
+                        error = RuntimeError(
+                            f"Aborting daily send after {failed} failures and {sent} successful sends"
                         )
-                        print(f"Sent {len(sentences)} sentences from '{text.title}' to {user.name}")
-                    else:
-                        print(f"Failed to send sentences to {user.name}")
-                        
-                except Exception as e:
-                    print(f"Error sending to user {user_id} for text {text_id}: {str(e)}")
+                        log.error("%s", error)
+                        raise error
+        finally:
+            # Release the SMTP connections opened by the worker threads
+            self.messaging.close()
     
     def process_translation_reply(self, sender: str, subject: str, body: str) -> None:
         """
@@ -191,39 +273,30 @@ class TranslationServiceApp:
             body: Body of the message containing translations
         """
         # Find the user based on email or phone
-        user_id = None
-        for uid, user in self.user_manager.users.items():
-            if user.email == sender or user.phone == sender:
-                user_id = uid
-                break
+        user_id = self.user_manager.find_by_contact(sender)
         
         if not user_id:
-            print(f"Unknown sender: {sender}")
+            log.warning("Unknown sender: %s", sender)
             return
         
         # Extract text_id from subject if possible (format: "Daily Translation: {text_title}")
         text_id = None
-        if subject.startswith("Daily Translation:"):
-            text_title = subject[len("Daily Translation:"):].strip()
-            # Find text with matching title
-            for tid, text in self.text_manager.texts.items():
-                if text.title == text_title:
-                    text_id = tid
-                    break
+        if subject.startswith(SUBJECT_PREFIX):
+            text_id = self.text_manager.find_by_title(subject.removeprefix(SUBJECT_PREFIX).strip())
         
         if not text_id:
             # If we can't determine the text, use the first one assigned to the user
             if self.user_manager.progress[user_id]:
-                text_id = self.user_manager.progress[user_id][0].text_id
+                text_id = next(iter(self.user_manager.progress[user_id]))
             else:
-                print(f"Could not determine which text user {user_id} is translating")
+                log.warning("Could not determine which text user %s is translating", user_id)
                 return
         
         # Parse the translations from the reply
         translations = self.messaging.process_reply(sender, subject, body)
         
         if not translations:
-            print(f"No translations found in reply from {sender}")
+            log.warning("No translations found in reply from %s", sender)
             return
         
         # Get the user's current progress
@@ -238,17 +311,23 @@ class TranslationServiceApp:
         # Assuming the user is replying to the most recent sentences
         start_position = max(0, progress.current_position - sentences_per_day)
         
-        # Save each translation
+        # Collect the translations that map to a sentence in the text
+        batch = {}
         for rel_idx, translation in translations.items():
             abs_idx = start_position + rel_idx
-            
-            # Save in user's progress
-            self.user_manager.save_translation(user_id, text_id, abs_idx, translation)
-            
-            # Also save in the text manager
-            self.text_manager.save_translated_sentence(text_id, abs_idx, translation)
-        
-        print(f"Saved {len(translations)} translations from {self.user_manager.get_user(user_id).name} for '{text.title}'")
+            if not 0 <= abs_idx < text.n_sentences:
+                log.warning("Ignoring translation %d from %s: no such sentence in '%s'",
+                            rel_idx + 1, sender, text.title)
+                continue
+            batch[abs_idx] = translation
+        
+        if batch:
+            # Save in user's progress, and in the text manager
+            self.user_manager.save_translations(user_id, text_id, batch)
+            self.text_manager.save_translated_sentences(text_id, batch)
+        
+        log.info("Saved %d translations from %s for '%s'",
+                 len(batch), self.user_manager.get_user(user_id).name, text.title)
     
     def generate_translation_file(self, text_id: str, output_format: str = "txt") -> str:
         """
@@ -277,9 +356,10 @@ class TranslationServiceApp:
         # Get status
         status = self.assembler.get_translation_status(text, translations)
         
-        print(f"Generated translation file for '{text.title}'")
-        print(f"Completion: {status['completion_percentage']:.1f}% ({status['translated_sentences']}/{status['total_sentences']} sentences)")
-        print(f"Output file: {output_path}")
+        log.info("Generated translation file for '%s'", text.title)
+        log.info("Completion: %.1f%% (%d/%d sentences)",
+                 status['completion_percentage'], status['translated_sentences'], status['total_sentences'])
+        log.info("Output file: %s", output_path)
         
         return output_path
     
@@ -294,11 +374,10 @@ class TranslationServiceApp:
             A simple ID string
         """
         # Convert to lowercase, replace spaces with underscores, remove non-alphanumeric
-        id_base = "".join(c for c in name.lower().replace(" ", "_") if c.isalnum() or c == "_")
+        id_base = _ID_STRIP_RE.sub("", name.lower().replace(" ", "_"))
         
-        # Add timestamp to ensure uniqueness
-        timestamp = int(time.time())
-        return f"{id_base}_{timestamp}"
+        # Add the startup timestamp and a sequence number to ensure uniqueness
+        return f"{id_base}_{_ID_EPOCH}_{next(_ID_SEQ)}"
 
 
 def parse_args():
@@ -351,6 +430,7 @@ def parse_args():
 
 def main():
     """Main entry point for the application."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     args = parse_args()
     app = TranslationServiceApp()
     
@@ -364,7 +444,7 @@ def main():
             sentences_per_day=args.sentences_per_day
         )
         print(f"Registered text: {text.title} (ID: {text.id})")
-        print(f"Total sentences: {len(text.sentences)}")
+        print(f"Total sentences: {text.n_sentences}")
         
     elif args.command == "register_user":
         method = DeliveryMethod.EMAIL if args.preferred_method == "email" else DeliveryMethod.SMS
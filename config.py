@@ -17,6 +17,8 @@ class Config:
     EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "translation_service@example.com")
     EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
     EMAIL_USE_TLS = True
+    EMAIL_TIMEOUT = float(os.environ.get("EMAIL_TIMEOUT", "30"))  # Seconds before a stalled SMTP connection gives up
+    EMAIL_ENABLED = os.environ.get("EMAIL_ENABLED", "").lower() in ("1", "true", "yes")  # Actually deliver emails over SMTP
     REPLY_TO_EMAIL = os.environ.get("REPLY_TO_EMAIL", "translations@example.com")
     
     # SMS configuration (if using a service like Twilio)
@@ -27,6 +29,7 @@ class Config:
     # Application settings
     DEFAULT_SENTENCES_PER_DAY = 3
     SEND_TIME_HOUR = 8  # Send at 8 AM by default
+    SEND_MAX_WORKERS = 8  # Number of threads sending daily portions in parallel
     MAX_SENTENCE_LENGTH = 200  # Maximum length of a sentence in characters
     
     # Ensure required directories exist
@@ -11,9 +11,13 @@ This script demonstrates the basic workflow of the translation service:
 6. Generating a translation file
 """
 
+import logging
+
 from app import TranslationServiceApp
 from models import DeliveryMethod
 
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 # Initialize the application
 app = TranslationServiceApp()
 
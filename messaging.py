@@ -1,20 +1,42 @@
+import itertools
+import logging
 import smtplib
 import os
+import threading
+from collections import deque
 from email.message import EmailMessage
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Sequence
 from datetime import datetime
 import re
 
 from models import User, DeliveryMethod
 
 
+log = logging.getLogger(__name__)
+
+# Seconds to wait on a stalled SMTP server when the config gives no timeout
+DEFAULT_SMTP_TIMEOUT = 30
+
+# Subject prefix of daily portion emails, followed by the text title
+SUBJECT_PREFIX = "Daily Translation:"
+
+# Translation markers in a reply: "[1] Translation text", or "1. Translation text"
+# as a fallback when the reply has no bracket markers at all
+_BRACKET_MARKER_RE = re.compile(r'\[(\d+)\]')
+_NUMBER_MARKER_RE = re.compile(r'(\d+)\.')
+
+
 class MessagingService:
     """Handles sending and receiving messages via email or SMS."""
     
+    # Sequence number that totally orders message log entries
+    _log_seq = itertools.count()
+    
     def __init__(self, 
                  email_config: Dict = None, 
                  sms_config: Dict = None,
-                 reply_email: str = None):
+                 reply_email: str = None,
+                 message_log_size: int = 10_000):
         """
         Initialize the MessagingService.
         
@@ -22,51 +44,119 @@ class MessagingService:
             email_config: Configuration for email service
             sms_config: Configuration for SMS service
             reply_email: Email address where users should send their translations
+            message_log_size: Maximum number of recent messages kept in the message log
         """
         self.email_config = email_config or {}
         self.sms_config = sms_config or {}
         self.reply_email = reply_email
         
-        # Set up a basic logging mechanism
-        self.message_log = []
+        # Set up a basic logging mechanism, keeping only the most recent messages
+        self.message_log = deque(maxlen=message_log_size)
+        
+        # SMTP connections, one per sending thread, opened on first send and reused until close()
+        self._local = threading.local()
+        self._connections: List[smtplib.SMTP] = []
+        self._connections_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def iter_log(self) -> Iterator[Dict]:
+        """Iterate over the logged messages, oldest first."""
+        return iter(self.message_log)
+    
+    def close(self) -> None:
+        """Close every cached SMTP connection."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for smtp in connections:
+            self._quit(smtp)
+        self._local = threading.local()
+    
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP) -> None:
+        """Quit an SMTP connection, ignoring a server that already hung up."""
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            # The server already dropped the connection; nothing left to clean up
+            pass
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Get this thread's logged-in SMTP connection, reusing it while it is alive.
+        
+        Returns:
+            An authenticated SMTP connection
+        """
+        smtp = getattr(self._local, 'smtp', None)
+        if smtp is not None:
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            with self._connections_lock:
+                if smtp in self._connections:
+                    self._connections.remove(smtp)
+            self._quit(smtp)
+        
+        smtp = smtplib.SMTP(self.email_config['host'], self.email_config['port'],
+                            timeout=self.email_config.get('timeout', DEFAULT_SMTP_TIMEOUT))
+        if self.email_config.get('use_tls'):
+            smtp.starttls()
+        if self.email_config.get('username') and self.email_config.get('password'):
+            smtp.login(self.email_config['username'], self.email_config['password'])
+        
+        self._local.smtp = smtp
+        with self._connections_lock:
+            self._connections.append(smtp)
+        return smtp
     
     def send_daily_portion(self, 
                           user: User, 
                           text_title: str, 
-                          sentences: List[str], 
-                          sentence_indices: List[int]) -> bool:
+                          sentences: Sequence[str], 
+                          start_index: int,
+                          now: Optional[datetime] = None) -> bool:
         """
         Send a daily portion of sentences to a user.
         
         Args:
             user: The user to send to
             text_title: Title of the text being translated
-            sentences: List of sentences to send
-            sentence_indices: Indices of the sentences in the original text
+            sentences: Sentences to send
+            start_index: Index of the first sentence in the original text
+            now: Timestamp to log the message under (defaults to the current time)
             
         Returns:
             True if the message was sent successfully, False otherwise
         """
         if user.preferred_method == DeliveryMethod.EMAIL:
-            return self._send_email(user, text_title, sentences, sentence_indices)
+            return self._send_email(user, text_title, sentences, start_index, now)
         elif user.preferred_method == DeliveryMethod.SMS:
-            return self._send_sms(user, text_title, sentences, sentence_indices)
+            return self._send_sms(user, text_title, sentences, start_index, now)
         else:
             raise ValueError(f"Unsupported delivery method: {user.preferred_method}")
     
     def _send_email(self, 
                    user: User, 
                    text_title: str, 
-                   sentences: List[str], 
-                   sentence_indices: List[int]) -> bool:
+                   sentences: Sequence[str], 
+                   start_index: int,
+                   now: Optional[datetime] = None) -> bool:
         """
         Send sentences via email.
         
         Args:
             user: The user to send to
             text_title: Title of the text being translated
-            sentences: List of sentences to send
-            sentence_indices: Indices of the sentences in the original text
+            sentences: Sentences to send
+            start_index: Index of the first sentence in the original text
+            now: Timestamp to log the message under (defaults to the current time)
             
         Returns:
             True if the email was sent successfully, False otherwise
@@ -75,13 +165,22 @@ class MessagingService:
             raise ValueError(f"User {user.id} does not have an email address")
         
         # Create the email content
-        subject = f"Daily Translation: {text_title}"
-        body = self._format_message_body(text_title, sentences, sentence_indices)
+        subject = f"{SUBJECT_PREFIX} {text_title}"
+        body = self._format_message_body(text_title, sentences, start_index)
+        
+        if self.email_config.get('enabled'):
+            msg = EmailMessage()
+            msg['From'] = self.email_config.get('username')
+            msg['To'] = user.email
+            if self.reply_email:
+                msg['Reply-To'] = self.reply_email
+            msg['Subject'] = subject
+            msg.set_content(body)
+            self._get_smtp().send_message(msg)
         
-        # In a real implementation, this would send an actual email
-        # For demonstration purposes, we'll just log it
         log_entry = {
-            'timestamp': datetime.now(),
+            'timestamp': now or datetime.now(),
+            'seq': next(self._log_seq),
             'method': 'email',
             'recipient': user.email,
             'subject': subject,
@@ -89,25 +188,25 @@ class MessagingService:
         }
         self.message_log.append(log_entry)
         
-        print(f"Email sent to {user.name} ({user.email}):")
-        print(f"Subject: {subject}")
-        print(f"Body:\n{body}")
+        log.info("Email sent to %s (%s):\nSubject: %s\nBody:\n%s", user.name, user.email, subject, body)
         
         return True
     
     def _send_sms(self, 
                  user: User, 
                  text_title: str, 
-                 sentences: List[str], 
-                 sentence_indices: List[int]) -> bool:
+                 sentences: Sequence[str], 
+                 start_index: int,
+                 now: Optional[datetime] = None) -> bool:
         """
         Send sentences via SMS.
         
         Args:
             user: The user to send to
             text_title: Title of the text being translated
-            sentences: List of sentences to send
-            sentence_indices: Indices of the sentences in the original text
+            sentences: Sentences to send
+            start_index: Index of the first sentence in the original text
+            now: Timestamp to log the message under (defaults to the current time)
             
         Returns:
             True if the SMS was sent successfully, False otherwise
@@ -116,51 +215,56 @@ class MessagingService:
             raise ValueError(f"User {user.id} does not have a phone number")
         
         # Create the SMS content (shorter for SMS)
-        body = f"Translation: {text_title}\n\n"
+        parts = [f"Translation: {text_title}", ""]
         for i, sentence in enumerate(sentences):
-            body += f"{i+1}. {sentence}\n"
+            parts.append(f"{i+1}. {sentence}")
+        parts.append("")
+        body = "\n".join(parts)
         
         # For demonstration purposes, we'll just log it
         log_entry = {
-            'timestamp': datetime.now(),
+            'timestamp': now or datetime.now(),
+            'seq': next(self._log_seq),
             'method': 'sms',
             'recipient': user.phone,
             'body': body
         }
         self.message_log.append(log_entry)
         
-        print(f"SMS sent to {user.name} ({user.phone}):")
-        print(f"Body:\n{body}")
+        log.info("SMS sent to %s (%s):\nBody:\n%s", user.name, user.phone, body)
         
         return True
     
     def _format_message_body(self, 
                             text_title: str, 
-                            sentences: List[str], 
-                            sentence_indices: List[int]) -> str:
+                            sentences: Sequence[str], 
+                            start_index: int) -> str:
         """
         Format the message body for email or SMS.
         
         Args:
             text_title: Title of the text being translated
-            sentences: List of sentences to send
-            sentence_indices: Indices of the sentences in the original text
+            sentences: Sentences to send
+            start_index: Index of the first sentence in the original text
             
         Returns:
             Formatted message body
         """
-        body = f"Here are your sentences to translate from '{text_title}':\n\n"
+        parts = [f"Here are your sentences to translate from '{text_title}':", ""]
         
-        for i, (sentence, idx) in enumerate(zip(sentences, sentence_indices)):
-            body += f"[{idx+1}] {sentence}\n\n"
+        for idx, sentence in enumerate(sentences, start=start_index + 1):
+            parts.append(f"[{idx}] {sentence}")
+            parts.append("")
         
-        body += "To submit your translations, please reply to this message with each "
-        body += "translation numbered as shown above.\n\n"
-        body += "Example:\n"
-        body += f"[1] Your translation of the first sentence.\n"
-        body += f"[2] Your translation of the second sentence.\n"
+        parts.append("To submit your translations, please reply to this message with each "
+                     "translation numbered as shown above.")
+        parts.append("")
+        parts.append("Example:")
+        parts.append("[1] Your translation of the first sentence.")
+        parts.append("[2] Your translation of the second sentence.")
+        parts.append("")
         
-        return body
+        return "\n".join(parts)
     
     def process_reply(self, 
                      sender: str, 
@@ -179,24 +283,14 @@ class MessagingService:
         """
         translations = {}
         
-        # Parse the reply to extract translations
-        # Looking for patterns like "[1] Translation text" or "1. Translation text"
-        pattern = r'\[(\d+)\](.*?)(?=\[\d+\]|\Z)'
-        alternative_pattern = r'(\d+)\.(.*?)(?=\d+\.|\Z)'
-        
-        # Try the primary pattern first
-        matches = re.findall(pattern, body, re.DOTALL)
-        if not matches:
-            # Try the alternative pattern
-            matches = re.findall(alternative_pattern, body, re.DOTALL)
+        # Bracket markers win; "n." markers are only used when there are none
+        marker_re = _BRACKET_MARKER_RE if _BRACKET_MARKER_RE.search(body) else _NUMBER_MARKER_RE
         
-        for idx_str, translation in matches:
-            try:
-                # Convert to 0-based index by subtracting 1 from user-provided number
-                idx = int(idx_str) - 1
-                translations[idx] = translation.strip()
-            except ValueError:
-                # Skip invalid indices
-                continue
+        # Splitting on the markers alternates text and captured numbers:
+        # [text before the first marker, number, translation, number, translation, ...]
+        parts = marker_re.split(body)
+        for i in range(1, len(parts), 2):
+            # Convert to 0-based index by subtracting 1 from user-provided number
+            translations[int(parts[i]) - 1] = parts[i + 1].strip()
         
         return translations
@@ -1,7 +1,8 @@
+import os
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Callable, List, Optional, Tuple
 
 
 class DeliveryMethod(Enum):
@@ -10,7 +11,7 @@ class DeliveryMethod(Enum):
     SMS = "sms"
 
 
-@dataclass
+@dataclass(slots=True)
 class TextSource:
     """A source text that requires translation."""
     id: str  # Unique identifier
@@ -20,14 +21,49 @@ class TextSource:
     target_language: str  # Target language for translation
     author: Optional[str] = None
     sentences_per_day: int = 3  # Number of sentences to send per day
-    sentences: List[str] = field(default_factory=list)  # Parsed sentences from the text
+    _sentences: Optional[Tuple[str, ...]] = field(default=None, init=False, repr=False, compare=False)  # Parsed sentences, loaded on first access
+    _loader: Optional[Callable[[], Tuple[str, ...]]] = field(default=None, init=False, repr=False, compare=False)  # Parses the text file
+    _n: Optional[int] = field(default=None, init=False, repr=False, compare=False)  # Cached sentence count
+    _base_name: Optional[str] = field(default=None, init=False, repr=False, compare=False)  # Cached file name without extension
+    
+    @property
+    def sentences(self) -> Tuple[str, ...]:
+        """Parsed sentences from the text, read from the file on first access."""
+        if self._sentences is None:
+            self._sentences = self._loader() if self._loader is not None else ()
+        return self._sentences
+    
+    @property
+    def n_sentences(self) -> int:
+        """Number of sentences in the text, computed once per parse."""
+        if self._n is None:
+            self._n = len(self.sentences)
+        return self._n
+    
+    @property
+    def base_name(self) -> str:
+        """File name of the text without directory or extension."""
+        if self._base_name is None:
+            self._base_name = os.path.splitext(os.path.basename(self.file_path))[0]
+        return self._base_name
+    
+    def set_sentences(self, sentences: Tuple[str, ...]) -> None:
+        """Replace the parsed sentences and reset the cached count."""
+        self._sentences = sentences
+        self._n = None
+    
+    def set_loader(self, loader: Callable[[], Tuple[str, ...]]) -> None:
+        """Set how sentences are parsed, deferring the parse until they are first needed."""
+        self._loader = loader
+        self._sentences = None
+        self._n = None
     
     def total_days(self) -> int:
         """Calculate the total number of days needed to translate this text."""
-        return (len(self.sentences) + self.sentences_per_day - 1) // self.sentences_per_day
+        return (self.n_sentences + self.sentences_per_day - 1) // self.sentences_per_day
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """A user who translates texts."""
     id: str  # Unique identifier
@@ -44,27 +80,33 @@ class User:
             raise ValueError("Phone number is required for SMS delivery")
 
 
-@dataclass
+@dataclass(slots=True)
 class TranslationProgress:
     """Tracks a user's progress in translating a specific text."""
     user_id: str
     text_id: str
     current_position: int = 0  # Current sentence index
     last_sent_date: Optional[datetime] = None
-    translations: Dict[int, str] = field(default_factory=dict)  # Maps sentence index to translation
+    translations: List[Optional[str]] = field(default_factory=list)  # Translation per sentence index, None if untranslated
+    
+    @property
+    def translated_count(self) -> int:
+        """Count the sentences that have a translation."""
+        return sum(t is not None for t in self.translations)
     
     @property
     def is_complete(self) -> bool:
         """Check if the translation is complete."""
-        return len(self.translations) >= self.current_position
+        return self.translated_count >= self.current_position
     
     @property
     def completion_percentage(self) -> float:
         """Calculate the percentage of completion."""
-        if not hasattr(self, '_total_sentences'):
+        if not self.translations:
             return 0.0
-        return (len(self.translations) / self._total_sentences) * 100
+        return (self.translated_count / len(self.translations)) * 100
     
     def set_total_sentences(self, total: int) -> None:
         """Set the total number of sentences in the text."""
-        self._total_sentences = total
+        if total > len(self.translations):
+            self.translations.extend([None] * (total - len(self.translations)))
@@ -1,9 +1,65 @@
+import json
+import logging
 import os
 import re
-import nltk
-from typing import List, Optional
+import sys
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
 from models import TextSource
+from translation_assembler import UNTRANSLATED_PREFIX, UNTRANSLATED_SUFFIX
+
+
+log = logging.getLogger(__name__)
+
+
+# Number of parsed files kept by each TextManager, keyed by path, mtime and size
+_PARSE_CACHE_SIZE = 32
+
+# Sentences shorter than this are interned, so repeated short sentences share one string
+_INTERN_MAX_LENGTH = 200
+
+# Runs of whitespace, collapsed to a single space before splitting
+_WS_RE = re.compile(r'\s+')
+
+# Candidate sentence boundary: whitespace after terminal punctuation, optionally
+# closed by a quote or bracket
+_SENT_SPLIT_RE = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\'\)\]”’»]))\s+')
+
+# Opening quotes and brackets that may precede the first letter of a sentence
+_SENT_OPENERS = '"\'([“‘«¿¡'
+
+# Abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset({'Mr.', 'Mrs.', 'Ms.', 'Dr.', 'St.', 'Prof.', 'Jr.', 'Sr.'})
+
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Split cleaned text into sentences.
+    
+    A candidate piece starts a new sentence only if its first character after any
+    opening quote or bracket is an upper-case letter (in any script) or a digit,
+    and the previous piece does not end with a known abbreviation.
+    
+    Args:
+        text: Text with whitespace already collapsed to single spaces
+        
+    Returns:
+        List of sentences
+    """
+    sentences = []
+    current = []
+    for piece in _SENT_SPLIT_RE.split(text):
+        if current:
+            first = piece.lstrip(_SENT_OPENERS)[:1]
+            if (first.isupper() or first.isdigit()) and current[-1].rpartition(' ')[2] not in _ABBREVIATIONS:
+                sentences.append(' '.join(current))
+                current = []
+        current.append(piece)
+    if current:
+        sentences.append(' '.join(current))
+    return sentences
 
 
 class TextManager:
@@ -18,12 +74,9 @@ class TextManager:
         """
         self.data_dir = data_dir
         self.texts = {}  # Dictionary of TextSource objects by ID
-        
-        # Ensure NLTK resources are available
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        self._by_title = {}  # Text title -> text ID
+        self._saved_translations: Dict[str, Dict[int, str]] = {}  # Absolute file path -> translations saved to disk
+        self._parse_cache: OrderedDict[Tuple[str, int, int], Tuple[str, ...]] = OrderedDict()  # Recently parsed files
     
     def register_text(self, 
                       id: str, 
@@ -66,11 +119,12 @@ class TextManager:
             sentences_per_day=sentences_per_day
         )
         
-        # Parse the text into sentences
-        text_source.sentences = self._parse_text(full_path)
+        # Parse the text into sentences when they are first needed
+        text_source.set_loader(partial(self._parse_text, full_path))
         
         # Store the text source
         self.texts[id] = text_source
+        self._by_title.setdefault(title, id)
         return text_source
     
     def get_text(self, text_id: str) -> TextSource:
@@ -87,7 +141,19 @@ class TextManager:
             raise KeyError(f"Text with ID '{text_id}' not found")
         return self.texts[text_id]
     
-    def get_daily_portion(self, text_id: str, position: int) -> List[str]:
+    def find_by_title(self, title: str) -> Optional[str]:
+        """
+        Find a text by its title.
+        
+        Args:
+            title: Title of the text
+            
+        Returns:
+            The ID of the matching text, or None if no text matches
+        """
+        return self._by_title.get(title)
+    
+    def get_daily_portion(self, text_id: str, position: int) -> Tuple[str, ...]:
         """
         Get a daily portion of sentences from a text.
         
@@ -96,14 +162,14 @@ class TextManager:
             position: Starting position (sentence index)
             
         Returns:
-            List of sentences for the day
+            Tuple of sentences for the day
         """
         text_source = self.get_text(text_id)
         start_idx = position
-        end_idx = min(start_idx + text_source.sentences_per_day, len(text_source.sentences))
+        end_idx = min(start_idx + text_source.sentences_per_day, text_source.n_sentences)
         return text_source.sentences[start_idx:end_idx]
     
-    def _parse_text(self, file_path: str) -> List[str]:
+    def _parse_text(self, file_path: str) -> Tuple[str, ...]:
         """
         Parse a text file into sentences.
         
@@ -111,20 +177,31 @@ class TextManager:
             file_path: Path to the text file
             
         Returns:
-            List of sentences
+            Tuple of sentences
         """
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
-            
-        # Clean the text (remove extra whitespace, etc.)
-        text = re.sub(r'\s+', ' ', text)
+        # Reuse the previous parse if the file has not changed since
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            return cached
         
-        # Use NLTK to split text into sentences
-        sentences = nltk.sent_tokenize(text)
+        # Read the file and clean the text (remove extra whitespace, etc.)
+        with open(file_path, 'r', encoding='utf-8') as file:
+            text = _WS_RE.sub(' ', file.read())
         
-        # Filter out empty sentences and strip whitespace
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # Split text into sentences at terminal punctuation, then strip whitespace
+        # and filter out empty sentences in the same pass
+        sentences = tuple(
+            sys.intern(stripped) if len(stripped) < _INTERN_MAX_LENGTH else stripped
+            for s in _split_sentences(text)
+            if (stripped := s.strip())
+        )
         
+        self._parse_cache[key] = sentences
+        if len(self._parse_cache) > _PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
         return sentences
     
     def save_translated_sentence(self, text_id: str, sentence_index: int, translation: str) -> None:
@@ -136,13 +213,56 @@ class TextManager:
             sentence_index: Index of the sentence in the text
             translation: Translated text
         """
-        # This would typically write to a database or file
-        # For now, we'll just print to demonstrate
+        self.save_translated_sentences(text_id, {sentence_index: translation})
+    
+    def save_translated_sentences(self, text_id: str, translations: Dict[int, str]) -> None:
+        """
+        Save several translated sentences with a single write.
+        
+        Args:
+            text_id: ID of the text
+            translations: Dictionary mapping sentence indices to translations
+        """
         text = self.get_text(text_id)
-        print(f"Saved translation for {text.title}, sentence {sentence_index}:")
-        print(f"Original: {text.sentences[sentence_index]}")
-        print(f"Translation: {translation}")
+        path = self._saved_translations_path(text)
+        saved = self._load_saved_translations(path)
+        saved.update(translations)
+        
+        # Write to a temporary file and swap it in so a crash never leaves a partial file
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump({str(i): t for i, t in saved.items()}, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         
+        log.info("Saved %d translations for %s to %s", len(translations), text.title, path)
+    
+    def _saved_translations_path(self, text: TextSource) -> str:
+        """Absolute path of the file holding the saved translations of a text."""
+        return os.path.abspath(os.path.join(
+            self.data_dir,
+            f"{os.path.splitext(text.file_path)[0]}_translations_{text.target_language}.json"
+        ))
+    
+    def _load_saved_translations(self, path: str) -> Dict[int, str]:
+        """
+        Get the translations saved in a file, reading it on first use.
+        
+        Cached by file rather than by text, so texts registered on the same file
+        and target language share one set of saved translations.
+        """
+        if path not in self._saved_translations:
+            saved = {}
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as file:
+                    saved = {int(i): t for i, t in json.load(file).items()}
+            self._saved_translations[path] = saved
+        return self._saved_translations[path]
+    
     def export_translations(self, text_id: str, translations: dict) -> str:
         """
         Export all translations for a text to a new file.
@@ -160,12 +280,20 @@ class TextManager:
             f"{os.path.splitext(text.file_path)[0]}_translated_{text.target_language}.txt"
         )
         
-        with open(output_path, 'w', encoding='utf-8') as file:
-            for i, sentence in enumerate(text.sentences):
-                if i in translations:
-                    file.write(f"{translations[i]}\n")
-                else:
-                    # Mark untranslated sentences
-                    file.write(f"[UNTRANSLATED: {sentence}]\n")
-                    
+        # Build the whole file, then encode and write it once
+        parts = []
+        append = parts.append
+        for i, sentence in enumerate(text.sentences):
+            if i in translations:
+                append(translations[i])
+            else:
+                # Mark untranslated sentences
+                append(UNTRANSLATED_PREFIX)
+                append(sentence)
+                append(UNTRANSLATED_SUFFIX)
+            append("\n")
+        
+        with open(output_path, 'wb') as file:
+            file.write("".join(parts).encode('utf-8'))
+        
         return output_path
@@ -1,10 +1,23 @@
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
 import json
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON export when installed
+    orjson = None
+
 from models import TextSource
 
 
+# Sentence endings after which a translation starts a new line in text output
+_SENTENCE_ENDINGS = ('.', '!', '?')
+
+# Marker wrapped around sentences that have no translation yet, shared by every export
+UNTRANSLATED_PREFIX = "[UNTRANSLATED: "
+UNTRANSLATED_SUFFIX = "]"
+
+
 class TranslationAssembler:
     """Compiles translated sentences into complete documents."""
     
@@ -17,45 +30,49 @@ class TranslationAssembler:
         """
         self.output_dir = output_dir
         
+        # Assembly method for each supported output format
+        self._dispatch = {
+            "txt": self._assemble_txt,
+            "json": self._assemble_json,
+        }
+        
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
     
     def assemble_translation(self, 
                            text_source: TextSource, 
-                           translations: Dict[int, str],
+                           translations: Mapping[int, str],
                            output_format: str = "txt") -> str:
         """
         Assemble translated sentences into a complete document.
         
         Args:
             text_source: The source text being translated
-            translations: Dictionary mapping sentence indices to translations
+            translations: Mapping of sentence indices to translations
             output_format: Format for the output file (txt, json, etc.)
             
         Returns:
             Path to the generated translation file
         """
         # Generate filename
-        base_name = os.path.splitext(os.path.basename(text_source.file_path))[0]
-        file_name = f"{base_name}_{text_source.target_language}"
+        file_name = f"{text_source.base_name}_{text_source.target_language}"
         
-        if output_format == "txt":
-            return self._assemble_txt(text_source, translations, file_name)
-        elif output_format == "json":
-            return self._assemble_json(text_source, translations, file_name)
-        else:
-            raise ValueError(f"Unsupported output format: {output_format}")
+        try:
+            handler = self._dispatch[output_format]
+        except KeyError:
+            raise ValueError(f"Unsupported output format: {output_format}") from None
+        return handler(text_source, translations, file_name)
     
     def _assemble_txt(self, 
                     text_source: TextSource, 
-                    translations: Dict[int, str],
+                    translations: Mapping[int, str],
                     file_name: str) -> str:
         """
         Assemble translations into a plain text file.
         
         Args:
             text_source: The source text being translated
-            translations: Dictionary mapping sentence indices to translations
+            translations: Mapping of sentence indices to translations
             file_name: Base name for the output file
             
         Returns:
@@ -63,31 +80,35 @@ class TranslationAssembler:
         """
         output_path = os.path.join(self.output_dir, f"{file_name}.txt")
         
-        with open(output_path, 'w', encoding='utf-8') as file:
-            for i, sentence in enumerate(text_source.sentences):
-                if i in translations:
-                    file.write(f"{translations[i]}")
-                    # Add space or newline based on the original text structure
-                    if sentence.endswith('.') or sentence.endswith('!') or sentence.endswith('?'):
-                        file.write('\n')
-                    else:
-                        file.write(' ')
-                else:
-                    # Mark untranslated sentences
-                    file.write(f"[UNTRANSLATED: {sentence}]")
+        # Build the whole document first, then encode and write it in one call
+        parts = []
+        append = parts.append
+        for sentence, translation in zip(text_source.sentences, self._dense_translations(text_source, translations)):
+            if translation is not None:
+                append(translation)
+                # Add space or newline based on the original text structure
+                append('\n' if sentence.endswith(_SENTENCE_ENDINGS) else ' ')
+            else:
+                # Mark untranslated sentences
+                append(UNTRANSLATED_PREFIX)
+                append(sentence)
+                append(UNTRANSLATED_SUFFIX)
+        
+        with open(output_path, 'wb') as file:
+            file.write(''.join(parts).encode('utf-8'))
         
         return output_path
     
     def _assemble_json(self, 
                      text_source: TextSource, 
-                     translations: Dict[int, str],
+                     translations: Mapping[int, str],
                      file_name: str) -> str:
         """
         Assemble translations into a JSON file with both original and translated text.
         
         Args:
             text_source: The source text being translated
-            translations: Dictionary mapping sentence indices to translations
+            translations: Mapping of sentence indices to translations
             file_name: Base name for the output file
             
         Returns:
@@ -101,38 +122,62 @@ class TranslationAssembler:
             "author": text_source.author,
             "source_language": text_source.language,
             "target_language": text_source.target_language,
-            "sentences": []
         }
         
         # Add sentences
-        for i, original in enumerate(text_source.sentences):
-            sentence_data = {
+        dense = self._dense_translations(text_source, translations)
+        data["sentences"] = [
+            {
                 "index": i,
                 "original": original,
-                "translation": translations.get(i, "[UNTRANSLATED]")
+                "translation": translation if translation is not None else "[UNTRANSLATED]"
             }
-            data["sentences"].append(sentence_data)
+            for i, (original, translation) in enumerate(zip(text_source.sentences, dense))
+        ]
         
         # Write to file
-        with open(output_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            with open(output_path, 'wb') as file:
+                file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
         
         return output_path
     
+    @staticmethod
+    def _dense_translations(text_source: TextSource,
+                            translations: Mapping[int, str]) -> List[Optional[str]]:
+        """
+        Lay out translations by sentence index.
+        
+        Args:
+            text_source: The source text being translated
+            translations: Mapping of sentence indices to translations
+            
+        Returns:
+            List with the translation of each sentence, or None where it is untranslated
+        """
+        dense = [None] * text_source.n_sentences
+        for i, translation in translations.items():
+            if 0 <= i < len(dense):
+                dense[i] = translation
+        return dense
+    
     def get_translation_status(self, 
                              text_source: TextSource, 
-                             translations: Dict[int, str]) -> Dict:
+                             translations: Mapping[int, str]) -> Dict:
         """
         Get statistics about the translation status.
         
         Args:
             text_source: The source text being translated
-            translations: Dictionary mapping sentence indices to translations
+            translations: Mapping of sentence indices to translations
             
         Returns:
             Dictionary with translation statistics
         """
-        total_sentences = len(text_source.sentences)
+        total_sentences = text_source.n_sentences
         translated_sentences = len(translations)
         
         return {
@@ -1,4 +1,6 @@
-from typing import Dict, List, Optional
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 from datetime import datetime
 
 from models import User, TranslationProgress, DeliveryMethod
@@ -10,7 +12,10 @@ class UserManager:
     def __init__(self):
         """Initialize the UserManager."""
         self.users: Dict[str, User] = {}  # Dictionary of User objects by ID
-        self.progress: Dict[str, List[TranslationProgress]] = {}  # Dictionary mapping user IDs to their translation progress
+        self.progress: Dict[str, Dict[str, TranslationProgress]] = {}  # User ID -> text ID -> translation progress
+        self._by_email: Dict[str, str] = {}  # Email address -> user ID
+        self._by_phone: Dict[str, str] = {}  # Phone number -> user ID
+        self.translations_by_text: Dict[str, Dict[int, str]] = defaultdict(dict)  # Text ID -> translations merged across users
     
     def register_user(self, 
                       id: str,
@@ -43,7 +48,11 @@ class UserManager:
         )
         
         self.users[id] = user
-        self.progress[id] = []
+        self.progress[id] = {}
+        if email:
+            self._by_email.setdefault(email, id)
+        if phone:
+            self._by_phone.setdefault(phone, id)
         return user
     
     def get_user(self, user_id: str) -> User:
@@ -60,6 +69,18 @@ class UserManager:
             raise KeyError(f"User with ID '{user_id}' not found")
         return self.users[user_id]
     
+    def find_by_contact(self, sender: str) -> Optional[str]:
+        """
+        Find a user by email address or phone number.
+        
+        Args:
+            sender: Email address or phone number
+            
+        Returns:
+            The ID of the matching user, or None if no user matches
+        """
+        return self._by_email.get(sender) or self._by_phone.get(sender)
+    
     def assign_text(self, user_id: str, text_id: str, total_sentences: int) -> TranslationProgress:
         """
         Assign a text to a user for translation.
@@ -76,9 +97,9 @@ class UserManager:
         user = self.get_user(user_id)
         
         # Check if user is already translating this text
-        for progress in self.progress[user_id]:
-            if progress.text_id == text_id:
-                raise ValueError(f"User '{user_id}' is already translating text '{text_id}'")
+        user_progress = self.progress[user_id]
+        if text_id in user_progress:
+            raise ValueError(f"User '{user_id}' is already translating text '{text_id}'")
         
         # Create progress tracker
         progress = TranslationProgress(
@@ -87,8 +108,8 @@ class UserManager:
         )
         progress.set_total_sentences(total_sentences)
         
-        # Add to progress list
-        self.progress[user_id].append(progress)
+        # Add to the user's progress
+        user_progress[text_id] = progress
         return progress
     
     def get_progress(self, user_id: str, text_id: str) -> TranslationProgress:
@@ -106,9 +127,9 @@ class UserManager:
         user = self.get_user(user_id)
         
         # Find the right progress object
-        for progress in self.progress[user_id]:
-            if progress.text_id == text_id:
-                return progress
+        progress = self.progress[user_id].get(text_id)
+        if progress is not None:
+            return progress
         
         raise ValueError(f"User '{user_id}' is not translating text '{text_id}'")
     
@@ -136,10 +157,27 @@ class UserManager:
             sentence_index: Index of the sentence in the text
             translation: Translated text
         """
+        self.save_translations(user_id, text_id, {sentence_index: translation})
+    
+    def save_translations(self, user_id: str, text_id: str, translations: Dict[int, str]) -> None:
+        """
+        Save several translated sentences from a user.
+        
+        Args:
+            user_id: ID of the user
+            text_id: ID of the text
+            translations: Dictionary mapping sentence indices to translations
+        """
         progress = self.get_progress(user_id, text_id)
-        progress.translations[sentence_index] = translation
+        for sentence_index in translations:
+            if not 0 <= sentence_index < len(progress.translations):
+                raise ValueError(f"Sentence index {sentence_index} is out of range for text '{text_id}'")
+        
+        for sentence_index, translation in translations.items():
+            progress.translations[sentence_index] = translation
+        self.translations_by_text[text_id].update(translations)
     
-    def get_all_translations(self, text_id: str) -> Dict[int, str]:
+    def get_all_translations(self, text_id: str) -> Mapping[int, str]:
         """
         Get all translations for a text from all users.
         
@@ -147,15 +185,6 @@ class UserManager:
             text_id: ID of the text
             
         Returns:
-            Dictionary mapping sentence indices to translations
+            Read-only live view mapping sentence indices to translations
         """
-        all_translations = {}
-        
-        # Check all users' progress
-        for user_id, progress_list in self.progress.items():
-            for progress in progress_list:
-                if progress.text_id == text_id:
-                    # Merge this user's translations
-                    all_translations.update(progress.translations)
-        
-        return all_translations
+        return MappingProxyType(self.translations_by_text.get(text_id, {}))